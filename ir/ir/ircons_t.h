@@ -35,6 +35,24 @@ static inline void verify_new_node_(ir_node *const node)
 #endif
 }
 
+/**
+ * Returns the volatility requested by the construction flags of a memory
+ * operation.
+ */
+static inline ir_volatility volatility_from_flags(ir_cons_flags const flags)
+{
+	return flags & cons_volatile ? volatility_is_volatile : volatility_non_volatile;
+}
+
+/**
+ * Returns the alignment requested by the construction flags of a memory
+ * operation.
+ */
+static inline ir_align align_from_flags(ir_cons_flags const flags)
+{
+	return flags & cons_unaligned ? align_non_aligned : align_is_aligned;
+}
+
 /**
  * Creates a new Anchor node.
  */
@@ -1,4 +1,4 @@
-#!/usr/bin/env python
+#!/usr/bin/env python3
 #
 # This file is part of libFirm.
 # Copyright (C) 2012 Karlsruhe Institute of Technology.
@@ -6,12 +6,108 @@ import sys
 # don't clutter our filesystem with .pyc files...
 sys.dont_write_bytecode = True
 import argparse
-from jinja2 import Environment
-import filters
+import contextlib
+import glob
+import hashlib
+import importlib.util
+import io
+import os
+import pickle
 import warnings
 warnings.filterwarnings("ignore", category=DeprecationWarning)
 import imp
-import jinjautil
+from jinjautil import find_template
+
+# Generator modules whose contents influence the produced output
+generator_sources = ["gen_ir.py", "jinjautil.py", "jinjaloader.py", "filters.py",
+                     "irops.py"]
+# Packages used for rendering. Their __init__ modules carry the version.
+render_packages = ["jinja2", "markupsafe"]
+
+
+def input_digest(config, templatepath):
+    """Computes a hash over everything that determines the generator output:
+    The generator itself, the specification files, python modules in the
+    include directories, the template, the definitions passed on the
+    commandline and the versions of jinja and of the interpreter."""
+    digest = hashlib.blake2b()
+    scriptdir = os.path.dirname(os.path.abspath(__file__))
+    sources = [os.path.join(scriptdir, name) for name in generator_sources]
+    sources += [config.specfile, templatepath] + config.extra
+    for dir in config.includedirs:
+        sources += sorted(glob.glob(os.path.join(dir, "*.py")))
+    sources += [importlib.util.find_spec(package).origin
+                for package in render_packages]
+    for source in sources:
+        with open(source, "rb") as f:
+            digest.update(f.read())
+    digest.update(repr(config.definitions).encode("utf-8"))
+    digest.update(repr(sys.version_info).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_filename(config):
+    specname = os.path.splitext(os.path.basename(config.specfile))[0]
+    templatename = os.path.basename(config.templatefile)
+    return os.path.join(config.cachedir,
+                        "%s.%s.cache" % (specname, templatename))
+
+
+def load_cached(filename, digest):
+    try:
+        with open(filename, "rb") as f:
+            (cached_digest, result) = pickle.load(f)
+    except Exception:
+        return None
+    if cached_digest != digest:
+        return None
+    return result
+
+
+def store_cached(filename, digest, result):
+    tmpfilename = "%s.%d.tmp" % (filename, os.getpid())
+    with open(tmpfilename, "wb") as f:
+        pickle.dump((digest, result), f, pickle.HIGHEST_PROTOCOL)
+    os.rename(tmpfilename, filename)
+
+
+def write_output(result):
+    # Pass the whole output to the OS at once, bypassing the text layer
+    sys.stdout.flush()
+    sys.stdout.buffer.write(result)
+
+
+def render(config):
+    from jinja2 import Environment, FileSystemBytecodeCache
+    import filters
+    import jinjautil
+    from jinjaloader import SimpleLoader
+
+    loader = SimpleLoader()
+    loader.includedirs += config.includedirs
+
+    # Load specfile
+    imp.load_source('spec', config.specfile)
+    for num, extrafile in enumerate(config.extra):
+        imp.load_source('extra%s' % (num,), extrafile)
+
+    # Templates are compiled to python code once, later runs only execute the
+    # compiled code against the current specification.
+    bytecode_cache = None
+    if config.cachedir is not None:
+        bytecode_cache = FileSystemBytecodeCache(config.cachedir,
+                                                 "%s.jinja.cache")
+
+    env = Environment(loader=loader, keep_trailing_newline=True,
+                      bytecode_cache=bytecode_cache)
+    env.globals.update(jinjautil.exports)
+    env.filters.update(jinjautil.filters)
+    for definition in config.definitions:
+        (name, _, replacement) = definition.partition("=")
+        env.globals[name] = replacement
+
+    template = env.get_template(config.templatefile)
+    return template.render()
 
 
 def main(argv):
@@ -26,34 +122,55 @@ def main(argv):
     parser.add_argument('-e', dest='extra', action='append',
                         help='load extra specification/filters',
                         default=[])
+    parser.add_argument('--cache-dir', dest='cachedir', action='store',
+                        help='reuse output of previous runs with unchanged inputs',
+                        default=None, metavar='DIR')
     parser.add_argument('specfile', action='store',
                         help='node specification file')
     parser.add_argument('templatefile', action='store',
                         help='jinja2 template file')
     config = parser.parse_args()
 
+    if config.cachedir is not None:
+        os.makedirs(config.cachedir, exist_ok=True)
+
+    # Keep the bytecode of the generator modules and of jinja in the cache
+    # directory, so they are not compiled again on every invocation.
+    if config.cachedir is not None and hasattr(sys, "pycache_prefix"):
+        sys.pycache_prefix = os.path.join(os.path.abspath(config.cachedir),
+                                          "pycache")
+        sys.dont_write_bytecode = False
+
     # Append includedirs to python path and template loader searchpath
     for dir in config.includedirs:
         sys.path.insert(1, dir)
 
-    loader = jinjautil.SimpleLoader()
-    loader.includedirs += config.includedirs
-
-    # Load specfile
-    imp.load_source('spec', config.specfile)
-    for num, extrafile in enumerate(config.extra):
-        imp.load_source('extra%s' % (num,), extrafile)
+    # Skip loading the specification and rendering when nothing changed
+    if config.cachedir is not None:
+        templatepath = find_template([""] + config.includedirs,
+                                     config.templatefile)
+        digest = input_digest(config, templatepath)
+        cachefile = cache_filename(config)
+        result = load_cached(cachefile, digest)
+        if result is not None:
+            write_output(result)
+            return
 
-    env = Environment(loader=loader, keep_trailing_newline=True)
-    env.globals.update(jinjautil.exports)
-    env.filters.update(jinjautil.filters)
-    for definition in config.definitions:
-        (name, _, replacement) = definition.partition("=")
-        env.globals[name] = replacement
-
-    template = env.get_template(config.templatefile)
-    result = template.render()
-    sys.stdout.write(result)
+    # Diagnostics printed while loading the spec and rendering are part of
+    # the output (they intentionally break compilation of the generated
+    # file), so they are collected and cached together with the result.
+    diagnostics = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(diagnostics):
+            result = render(config)
+    except:
+        # Still show what was printed before the failure
+        sys.stdout.write(diagnostics.getvalue())
+        raise
+    result = (diagnostics.getvalue() + result).encode("utf-8")
+    if config.cachedir is not None:
+        store_cached(cachefile, digest, result)
+    write_output(result)
 
 
 if __name__ == "__main__":
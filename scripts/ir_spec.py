@@ -446,7 +446,7 @@ class CopyB(Node):
     attrs = [
         Attribute("type", type="ir_type*", comment="type of copied data"),
         Attribute("volatility", type="ir_volatility",
-                  init="flags & cons_volatile ? volatility_is_volatile : volatility_non_volatile",
+                  init="volatility_from_flags(flags)",
                   to_flags="%s == volatility_is_volatile ? cons_volatile : cons_none",
                   comment="volatile CopyB nodes have a visible side-effect and may not be optimized"),
     ]
@@ -586,11 +586,11 @@ class Load(Node):
         Attribute("type", type="ir_type*",
                   comment="The type of the object which is stored at ptr (need not match with mode)"),
         Attribute("volatility", type="ir_volatility",
-                  init="flags & cons_volatile ? volatility_is_volatile : volatility_non_volatile",
+                  init="volatility_from_flags(flags)",
                   to_flags="%s == volatility_is_volatile ? cons_volatile : cons_none",
                   comment="volatile loads are a visible side-effect and may not be optimized"),
         Attribute("unaligned", type="ir_align",
-                  init="flags & cons_unaligned ? align_non_aligned : align_is_aligned",
+                  init="align_from_flags(flags)",
                   to_flags="%s == align_non_aligned ? cons_unaligned : cons_none",
                   comment="pointers to unaligned loads don't need to respect the load-mode/type alignments"),
     ]
@@ -648,12 +648,14 @@ class Mod(Node):
     arity_override = "oparity_binary"
 
 
+@op
 class Mul(Binop):
     """returns the product of its operands"""
     mode = "get_irn_mode(irn_left)"
     flags = ["commutative"]
 
 
+@op
 class Mulh(Binop):
     """returns the upper word of the product of its operands (the part which
     would not fit into the result mode of a normal Mul anymore)"""
@@ -890,11 +892,11 @@ class Store(Node):
         Attribute("type", type="ir_type*",
                   comment="The type of the object which is stored at ptr (need not match with value's type)"),
         Attribute("volatility", type="ir_volatility",
-                  init="flags & cons_volatile ? volatility_is_volatile : volatility_non_volatile",
+                  init="volatility_from_flags(flags)",
                   to_flags="%s == volatility_is_volatile ? cons_volatile : cons_none",
                   comment="volatile stores are a visible side-effect and may not be optimized"),
         Attribute("unaligned", type="ir_align",
-                  init="flags & cons_unaligned ? align_non_aligned : align_is_aligned",
+                  init="align_from_flags(flags)",
                   to_flags="%s == align_non_aligned ? cons_unaligned : cons_none",
                   comment="pointers to unaligned stores don't need to respect the load-mode/type alignments"),
     ]
@@ -1,11 +1,12 @@
 from jinjautil import export_filter, export
-from jinja2._compat import string_types
 from filters import arguments
-import imp
+from collections import namedtuple
+import functools
+import operator
 import sys
 
 
-class Node(object):
+class Node:
     '''Node base class'''
     only_regular = False
     pinned = "no"
@@ -33,34 +34,55 @@ def is_abstract(nodetype):
     return nodetype in abstracts
 
 
+# Node classes marked with @op in declaration order, grouped by the module
+# (specification) they were declared in.
+ops_by_module = dict()
+
+
+# Values of the irop_flags enum (see include/libfirm/irop.h)
+irop_flag_bits = {
+    "commutative":  1 << 0,
+    "cfopcode":     1 << 1,
+    "fragile":      1 << 2,
+    "forking":      1 << 3,
+    "constlike":    1 << 5,
+    "keep":         1 << 6,
+    "start_block":  1 << 7,
+    "uses_memory":  1 << 8,
+    "dump_noblock": 1 << 9,
+    "unknown_jump": 1 << 11,
+    "const_memory": 1 << 12,
+}
+
+
 def op(cls):
-    cls.__is_firm_op = True
-    # Without new-style classes it is hard to detect the inheritance hierarchy
-    # later.
-    assert hasattr(cls, "__class__"), "must use new-style classes"
+    ops_by_module.setdefault(cls.__module__, []).append(cls)
+    for flag in cls.flags:
+        if flag not in irop_flag_bits:
+            raise ValueError("node %s has unknown flag '%s'" %
+                             (cls.__name__, flag))
+    cls.flags_mask = functools.reduce(
+        operator.or_, (irop_flag_bits[f] for f in cls.flags), 0)
     return cls
 
 
-def is_op(nodetype):
-    return hasattr(nodetype, "__is_firm_op")
+class Attribute(namedtuple("Attribute", ["name", "type", "comment", "init",
+                                         "to_flags", "noprop", "fqname"])):
+    __slots__ = ()
 
-
-class Attribute(object):
-    def __init__(self, name, type, comment="", init=None, to_flags=None,
-                 noprop=False, fqname=None):
-        self.type = type
-        self.name = name
-        self.comment = comment
-        self.init = init
-        self.to_flags = to_flags
-        self.noprop = noprop
+    def __new__(cls, name, type, comment="", init=None, to_flags=None,
+                noprop=False, fqname=None):
+        # Names and types recur across many nodes, share a single copy
+        name = sys.intern(name)
         if fqname is None:
             fqname = name
-        self.fqname = fqname
+        return super(Attribute, cls).__new__(cls, name, sys.intern(type),
+                                             comment, init, to_flags, noprop,
+                                             fqname)
 
 
-class Operand(object):
-    pass
+class Operand:
+    __slots__ = ("name", "comment")
 
 
 def Input(name, comment=None):
@@ -70,15 +92,16 @@ def Input(name, comment=None):
     return op
 
 
-def Output(name, comment=None):
-    op = Operand()
-    op.name = name
-    op.comment = comment
-    return op
+# Pin states a node can declare and their C names
+pin_states = {
+    "yes":       "op_pin_state_pinned",
+    "no":        "op_pin_state_floats",
+    "exception": "op_pin_state_exc_pinned",
+}
 
 
 def verify_node(node):
-    if node.pinned not in ["yes", "no", "exception"]:
+    if node.pinned not in pin_states:
         print("%s: UNKNOWN PINNED MODE: %s" % (node.name, node.pinned))
 
     if node.pinned_init is not None and not is_dynamic_pinned(node):
@@ -116,28 +139,41 @@ def setdefault(node, attr, val):
         setattr(node, attr, val)
 
 
+# Many nodes have the same operands (mem, ptr, ...) and flags. Operand
+# objects and the normalized tuples are shared between all nodes with the
+# same declaration.
+interned_operands = dict()
+interned_tuples = dict()
+
+
+def intern_tuple(values):
+    values = tuple(values)
+    return interned_tuples.setdefault(values, values)
+
+
+def normalize_operand(operand):
+    if isinstance(operand, Operand):
+        return operand
+    if isinstance(operand, str):
+        key = (operand, None)
+    else:
+        key = operand
+    result = interned_operands.get(key)
+    if result is None:
+        result = Input(name=key[0], comment=key[1])
+        interned_operands[key] = result
+    return result
+
+
 def setnodedefaults(node):
     setldefault(node, "name", node.__name__)
 
     # As a shortcut you can specify inputs either as a list of strings or
-    # as a list of (name, comment) tuples. Normalize it to Input objects
-    new_ins = []
-    for i in node.ins:
-        if isinstance(i, string_types):
-            i = Input(i)
-        elif isinstance(i, tuple):
-            i = Input(name=i[0], comment=i[1])
-        new_ins.append(i)
-    node.ins = new_ins
+    # as a list of (name, comment) tuples. Normalize it to Operand objects
+    node.ins = intern_tuple(map(normalize_operand, node.ins))
     if hasattr(node, "outs"):
-        new_outs = []
-        for o in node.outs:
-            if isinstance(o, string_types):
-                o = Output(o)
-            elif isinstance(o, tuple):
-                o = Output(name=o[0], comment=o[1])
-            new_outs.append(o)
-        node.outs = new_outs
+        node.outs = intern_tuple(map(normalize_operand, node.outs))
+    node.flags = intern_tuple(node.flags)
 
     if hasattr(node, "__doc__"):
         node.doc = trim_docstring(node.__doc__)
@@ -185,21 +221,24 @@ def parameterlist(parameterlist):
     return "\n".join(parameterlist)
 
 
+# Templates expand the parameter lists several times per node (for each
+# constructor variant), they are only computed once per node.
+@functools.lru_cache(maxsize=None)
 def nodearguments(node):
     arguments = [arg.name for arg in node.arguments]
     return parameterlist(arguments)
 
 
+@functools.lru_cache(maxsize=None)
 def nodeparameters(node):
     parameters = ["%s %s" % (arg.type, arg.name) for arg in node.arguments]
     return parameterlist(parameters)
 
 
+@functools.lru_cache(maxsize=None)
 def nodeparametershelp(node):
-    res = ""
-    for param in node.arguments:
-        res += " * @param %-9s %s\n" % (param.name, param.comment)
-    return res
+    return "".join(" * @param %-9s %s\n" % (param.name, param.comment)
+                   for param in node.arguments)
 
 
 def a_an(text):
@@ -264,22 +303,18 @@ def insdecl(node):
         if len(node.ins) == 0:
             return ""
         insarity = len(node.ins)
-        res = "int r_arity = arity + " + repr(insarity) + ";"
-        res += "\n\tir_node **r_in= ALLOCAN(ir_node*, r_arity);"
-        i = 0
-        for input in node.ins:
-            res += "\n\tr_in[" + repr(i) + "] = irn_" + input.name + ";"
-            i += 1
-        res += "\n\tMEMCPY(&r_in[" + repr(insarity) + "], in, arity);\n\t"
+        lines = ["int r_arity = arity + %d;" % insarity,
+                 "ir_node **r_in= ALLOCAN(ir_node*, r_arity);"]
+        lines += ["r_in[%d] = irn_%s;" % (i, input.name)
+                  for i, input in enumerate(node.ins)]
+        lines += ["MEMCPY(&r_in[%d], in, arity);" % insarity, ""]
     elif arity == 0:
         return ""
     else:
-        res = "ir_node *in[" + repr(arity) + "];"
-        i = 0
-        for input in node.ins:
-            res += "\n\tin[" + repr(i) + "] = irn_" + input.name + ";"
-            i += 1
-    return res
+        lines = ["ir_node *in[%d];" % arity]
+        lines += ["in[%d] = irn_%s;" % (i, input.name)
+                  for i, input in enumerate(node.ins)]
+    return "\n\t".join(lines)
 
 
 def arity_and_ins(node):
@@ -305,22 +340,15 @@ def arity(node):
 
 
 def pinned(node):
-    pinned = node.pinned
-    if pinned == "yes":
-        return "op_pin_state_pinned"
-    if pinned == "no":
-        return "op_pin_state_floats"
-    if pinned == "exception":
-        return "op_pin_state_exc_pinned"
-    print("WARNING: Unknown pinned state %s in format pined" % pinned)
-    return ""
+    pin_state = pin_states.get(node.pinned)
+    if pin_state is None:
+        print("WARNING: Unknown pinned state %s in format pined" % node.pinned)
+        return ""
+    return pin_state
 
 
 def flags(node):
-    flags = list(map(lambda x: "irop_flag_" + x, node.flags))
-    if not flags:
-        flags = ["irop_flag_none"]
-    return " | ".join(flags)
+    return "0x%X" % node.flags_mask
 
 
 def stringformat(string, *args):
@@ -366,6 +394,7 @@ def block(node):
         return ""
 
 
+@functools.lru_cache(maxsize=None)
 def simplify_type(string):
     """Returns a simplified version of a C type for use in a function name.
     Stars are replaced with _ref, spaces removed and the ir_ firm namespace
@@ -384,32 +413,31 @@ for f in [a_an, args, arity_and_ins, arity, attr_size, blockargument, block,
     export_filter(f)
 
 
+# Constructor arguments that do not depend on the node
+arity_arguments = (
+    Attribute("arity", type="int", comment="size of additional inputs array"),
+    Attribute("in", type="ir_node *const *", comment="additional inputs"),
+)
+mode_argument = Attribute("mode", type="ir_mode *",
+                          comment="mode of the operations result")
+pinned_argument = Attribute("pinned", type="int", comment="pinned state")
+pin_state_initattr = Attribute("pin_state", fqname="exc.pinned", type="int",
+                               init="pinned")
+
+
 def _preprocess_node(node):
     # construct node arguments
-    arguments = []
+    arguments = [Attribute("irn_" + input.name, type="ir_node *",
+                           comment=input.name) for input in node.ins]
     initattrs = []
-    for input in node.ins:
-        arguments.append(
-            Attribute("irn_" + input.name, type="ir_node *",
-                      comment=input.name))
 
     if node.arity == "variable" or node.arity == "dynamic":
-        arguments.append(
-            Attribute("arity", type="int",
-                      comment="size of additional inputs array"))
-        arguments.append(
-            Attribute("in", type="ir_node *const *",
-                      comment="additional inputs"))
+        arguments += arity_arguments
 
     if node.mode is None:
-        arguments.append(
-            Attribute("mode", type="ir_mode *",
-                      comment="mode of the operations result"))
+        arguments.append(mode_argument)
 
-    for attr in node.attrs:
-        if attr.init is not None:
-            continue
-        arguments.append(attr)
+    arguments += [attr for attr in node.attrs if attr.init is None]
 
     # dynamic pin state means more constructor arguments
     if is_dynamic_pinned(node):
@@ -418,43 +446,32 @@ def _preprocess_node(node):
                 Attribute("pinned", fqname="exc.pinned",
                           type="int", init=node.pinned_init))
         else:
-            arguments.append(
-                Attribute("pinned", type="int", comment="pinned state"))
-            initattrs.append(
-                Attribute("pin_state", fqname="exc.pinned",
-                          type="int", init="pinned"))
+            arguments.append(pinned_argument)
+            initattrs.append(pin_state_initattr)
     if node.throws_init is not None:
         initattrs.append(
             Attribute("throws_exception", fqname="exc.throws_exception",
                       type="unsigned", init=node.throws_init))
 
-    for arg in node.constructor_args:
-        arguments.append(arg)
+    arguments += node.constructor_args
 
     node.arguments = arguments
     node.initattrs = initattrs
 
 
 def prepare_nodes(namespace):
-    nodes = []
-    for x in namespace.values():
-        if not is_op(x):
-            continue
-        setnodedefaults(x)
-        verify_node(x)
-        nodes.append(x)
+    nodes = collect_ops(namespace)
+    for node in nodes:
+        setnodedefaults(node)
+        verify_node(node)
     nodes.sort(key=lambda x: x.name)
     if len(nodes) == 0:
-        print("Warning: No nodes found in spec file '%s'" % filename)
+        print("Warning: No nodes found in spec '%s'" % namespace["__name__"])
 
-    real_nodes = []
-    abstract_nodes = []
-    for node in nodes:
-        if is_abstract(node):
-            abstract_nodes.append(node)
-        else:
-            real_nodes.append(node)
-            _preprocess_node(node)
+    real_nodes = [node for node in nodes if not is_abstract(node)]
+    abstract_nodes = [node for node in nodes if is_abstract(node)]
+    for node in real_nodes:
+        _preprocess_node(node)
 
     return (real_nodes, abstract_nodes)
 
@@ -468,14 +485,11 @@ def is_fragile(node):
 
 
 def inout_contains(l, name):
-    for entry in l:
-        if entry.name == name:
-            return True
-    return False
+    return any(entry.name == name for entry in l)
 
 
 def collect_ops(moduledict):
-    return [node for node in moduledict.values() if is_op(node)]
+    return list(ops_by_module.get(moduledict["__name__"], ()))
 
 
 def verify_spec(spec):
@@ -487,3 +501,4 @@ def verify_spec(spec):
 
 export(is_dynamic_pinned)
 export(is_abstract)
+export(irop_flag_bits, "irop_flag_bits")
@@ -0,0 +1,30 @@
+# This file is part of libFirm.
+# Copyright (C) 2015 Matthias Braun
+from jinja2 import BaseLoader
+from jinjautil import find_template
+
+
+class SimpleLoader(BaseLoader):
+    """
+    Simple FileSystemLoader variant. Compared to the default loader in jinja
+    it does not perform searchpath magic and does not reject paths containig
+    ``..`` (the jinja one does that for security reasons).
+    Note that simply using env.from_string is a not a good alternative as
+    then we miss filename and linenumber in error messages from jinja.
+    """
+    def __init__(self):
+        super(SimpleLoader, self).__init__()
+        self.includedirs = [""]
+
+    def get_source(self, environment, name):
+        path = find_template(self.includedirs, name)
+        with open(path) as f:
+            contents = f.read()
+
+        def uptodate():
+            return False
+
+        return contents, name, uptodate
+
+    def list_template(self):
+        return []
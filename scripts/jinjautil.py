@@ -1,36 +1,16 @@
 # This file is part of libFirm.
 # Copyright (C) 2015 Matthias Braun
-from jinja2 import BaseLoader
-
-
-class SimpleLoader(BaseLoader):
-    """
-    Simple FileSystemLoader variant. Compared to the default loader in jinja
-    it does not perform searchpath magic and does not reject paths containig
-    ``..`` (the jinja one does that for security reasons).
-    Note that simply using env.from_string is a not a good alternative as
-    then we miss filename and linenumber in error messages from jinja.
-    """
-    def __init__(self):
-        super(SimpleLoader, self).__init__()
-        self.includedirs = [""]
-
-    def get_source(self, environment, name):
-        for dir in self.includedirs:
-            try:
-                path = name if dir == "" else "%s/%s" % (dir, name)
-                contents = open(path).read()
-            except:
-                continue
-
-            def uptodate():
-                return False
-
-            return contents, name, uptodate
-        raise Exception("Could not open '%s'" % name)
-
-    def list_template(self):
-        return []
+import os
+
+
+def find_template(includedirs, name):
+    """Returns the path of template `name` in the first of `includedirs`
+    containing it. An empty entry stands for the current directory."""
+    for dir in includedirs:
+        path = name if dir == "" else "%s/%s" % (dir, name)
+        if os.path.isfile(path):
+            return path
+    raise Exception("Could not open '%s'" % name)
 
 
 exports = dict()
@@ -22,6 +22,11 @@
 #include "util.h"
 {% endif %}
 
+/* op_descs below uses precomputed irop_flags masks */
+{%- for flag, bit in irop_flag_bits|dictsort %}
+typedef char irop_flag_{{flag}}_check[irop_flag_{{flag}} == {{"0x%X"|stringformat(bit)}} ? 1 : -1];
+{%- endfor %}
+
 {% if spec.external %}
 static unsigned {{spec.name}}_opcode_start;
 
@@ -193,37 +198,64 @@ void (set_{{node.name}}_{{attr.name}})(ir_node *node, {{attr.type}} {{attr.name}
 {%- endfor -%}
 {% endfor %}
 
+typedef struct op_desc {
+	ir_op       **op;           /**< the op_* variable to initialize */
+	unsigned      code;         /**< opcode relative to the spec start */
+	char const   *name;
+	op_pin_state  pin_state;
+	irop_flags    flags;
+	op_arity      opar;
+	int           op_index;
+	size_t        attr_size;
+	int           memory_index; /**< memory input if irop_flag_uses_memory */
+	unsigned      pn_x_regular; /**< only used if irop_flag_fragile */
+	unsigned      pn_x_except;  /**< only used if irop_flag_fragile */
+} op_desc_t;
+
+static const op_desc_t op_descs[] = {
+	{%- for node in nodes %}
+	{ {% filter arguments %}
+		&op_{{node.name}}
+		{{spec.name}}o_{{node.name}}
+		"{{node.name}}"
+		{{node|pinned}}
+		{{node|flags}}
+		{{node|arity}}
+		{{node|opindex}}
+		{{node|attr_size}}
+		{% if "uses_memory" in node.flags -%} n_{{node.name}}_mem {%- else -%} -1 {%- endif %}
+		{% if "fragile" in node.flags -%} pn_{{node.name}}_X_regular {%- else -%} 0 {%- endif %}
+		{% if "fragile" in node.flags and not node.only_regular -%} pn_{{node.name}}_X_except {%- elif "fragile" in node.flags -%} (unsigned)-1 {%- else -%} 0 {%- endif %}
+	{% endfilter %} },
+	{%- endfor %}
+};
+
 void {{spec.name}}_init_opcodes(void)
 {
 	{%- if spec.external %}
 	{{spec.name}}_opcode_start = get_next_ir_opcodes({{spec.name}}o_last+1);
 	unsigned o = {{spec.name}}_opcode_start;
-	{% endif -%}
-
-	{%- for node in nodes %}
-	op_{{node.name}} = new_ir_op(
-		{%- filter arguments %}
-			{%- if spec.external -%} o+ {%- endif -%}
-			{{spec.name}}o_{{node.name}}
-			"{{node.name}}"
-			{{node|pinned}}
-			{{node|flags}}
-			{{node|arity}}
-			{{node|opindex}}
-			{{node|attr_size}}
-		{% endfilter %});
-	{%- if "uses_memory" in node.flags: %}
-	ir_op_set_memory_index(op_{{node.name}}, n_{{node.name}}_mem);
-	{%- endif -%}
-	{%- if "fragile" in node.flags: %}
-	ir_op_set_fragile_indices(op_{{node.name}}, pn_{{node.name}}_X_regular, {% if node.only_regular -%} (unsigned)-1 {%- else -%} pn_{{node.name}}_X_except {%- endif -%});
-	{%- endif -%}
-	{%- endfor %}
+	{%- else %}
+	unsigned o = 0;
+	{%- endif %}
+	for (size_t i = 0; i < sizeof(op_descs) / sizeof(*op_descs); ++i) {
+		op_desc_t const *const desc = &op_descs[i];
+		ir_op *const op = new_ir_op(o + desc->code, desc->name, desc->pin_state,
+		                            desc->flags, desc->opar, desc->op_index,
+		                            desc->attr_size);
+		if (desc->flags & irop_flag_uses_memory)
+			ir_op_set_memory_index(op, desc->memory_index);
+		if (desc->flags & irop_flag_fragile)
+			ir_op_set_fragile_indices(op, desc->pn_x_regular, desc->pn_x_except);
+		*desc->op = op;
+	}
 }
 
 void {{spec.name}}_finish_opcodes(void)
 {
-	{%- for node in nodes %}
-	free_ir_op(op_{{node.name}}); op_{{node.name}} = NULL;
-	{%- endfor %}
+	for (size_t i = 0; i < sizeof(op_descs) / sizeof(*op_descs); ++i) {
+		op_desc_t const *const desc = &op_descs[i];
+		free_ir_op(*desc->op);
+		*desc->op = NULL;
+	}
 }
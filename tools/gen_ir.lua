@@ -24,7 +24,7 @@ for _, template in ipairs(templates) do
     local output = path.join(path_output, template)
 
     local command = {
-        "python",
+        "python3",
         script_ir_gen,
         script_ir_spec,
         input,